@@ -0,0 +1,91 @@
+import re
+import time
+
+# Seconds of uncommitted text before it is committed without a sentence boundary
+MAX_DELAY = 4.0
+# Characters of already committed text re-run through keyword extraction with new text
+OVERLAP_CHARS = 80
+
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s|$)')
+
+
+# Incrementally aggregates chunk transcriptions into committed text.
+# extract_spans(text) returns [(char_offset, keyword), ...] for the given text.
+# Text is committed on sentence boundaries or once it has waited max_delay seconds;
+# keywords are extracted from the committed text plus a tail of earlier text, and
+# hits that were already reported for that overlapping tail are not reported again.
+class TranscriptAggregator:
+    def __init__(self, extract_spans, max_delay=MAX_DELAY, overlap_chars=OVERLAP_CHARS, clock=time.monotonic):
+        self.extract_spans = extract_spans
+        self.max_delay = max_delay
+        self.overlap_chars = overlap_chars
+        self.clock = clock
+        self._pending = ""
+        self._pending_since = None
+        self._context = ""      # tail of the committed stream
+        self._length = 0        # length of the committed stream (segments joined by spaces)
+        self._reported = set()  # stream offsets of keyword hits already reported
+
+    # Add a chunk transcription; returns the list of (text, keywords) commits it caused
+    def add(self, text, now=None):
+        now = self.clock() if now is None else now
+        text = text.strip()
+        commits = []
+        if text:
+            if self._pending:
+                self._pending += " " + text
+            else:
+                self._pending = text
+                self._pending_since = now
+
+            boundary = None
+            for match in SENTENCE_END.finditer(self._pending):
+                boundary = match.end()
+            if boundary is not None:
+                commits.append(self._commit(self._pending[:boundary]))
+                self._pending = self._pending[boundary:].strip()
+                self._pending_since = now if self._pending else None
+
+        commits.extend(self.poll(now))
+        return commits
+
+    # Commit pending text that has waited longer than max_delay
+    def poll(self, now=None):
+        now = self.clock() if now is None else now
+        if self._pending and now - self._pending_since >= self.max_delay:
+            return self.flush()
+        return []
+
+    # Commit whatever text is pending
+    def flush(self):
+        if not self._pending:
+            return []
+        text = self._pending
+        self._pending = ""
+        self._pending_since = None
+        return [self._commit(text)]
+
+    def _commit(self, text):
+        context = self._context
+        window = context + " " + text if context else text
+        text_start = self._length + 1 if self._length else 0
+        window_start = text_start - len(window) + len(text)
+        self._length = text_start + len(text)
+
+        keywords = []
+        for offset, keyword in self.extract_spans(window):
+            position = window_start + offset
+            if position not in self._reported:
+                self._reported.add(position)
+                keywords.append(keyword)
+
+        # Keep the tail of the stream, starting on a word boundary
+        cut = max(0, len(window) - self.overlap_chars)
+        if cut > 0 and window[cut - 1] != " ":
+            space = window.find(" ", cut)
+            cut = len(window) if space == -1 else space + 1
+        self._context = window[cut:]
+        context_start = self._length - len(self._context)
+        self._reported = {position for position in self._reported if position >= context_start}
+
+        return text, keywords
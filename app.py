@@ -1,13 +1,12 @@
 import os
 import json
 import streamlit as st
-import sounddevice as sd
-import numpy as np
-import queue
-import threading
 import time
+import queue
 from PIL import Image
-from faster_whisper import WhisperModel
+from whisper_profile import create_whisper_model, load_whisper_profile
+from lecture_plan import ImagePrefetcher, resize_image, split_keyword_map
+from engine import Engine
 import spacy
 
 # Set page config
@@ -35,10 +34,10 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize the Whisper model
+# Initialize the Whisper model with the autotuned profile (see autotune.py)
 @st.cache_resource
 def load_whisper_model():
-    return WhisperModel("small", device="cpu", compute_type="int8")
+    return create_whisper_model(load_whisper_profile())
 
 model = load_whisper_model()
 
@@ -49,10 +48,6 @@ def load_spacy_model():
 
 nlp = load_spacy_model()
 
-# Create queues
-audio_queue = queue.Queue()
-gui_queue = queue.Queue()
-
 # Define audio stream parameters
 samplerate = 16000
 duration = 5
@@ -69,50 +64,27 @@ def load_keyword_image_map(config_file):
         st.error(f"The file {config_file} is not a valid JSON.")
     return {}
 
-keyword_image_map = load_keyword_image_map('keywords.json')
-
-# Function to extract keywords from text using spaCy
-def extract_keywords(text):
-    doc = nlp(text)
-    keywords = [token.text for token in doc if token.pos_ in ("NOUN", "PROPN")]
-    return keywords
-
-# Callback function to capture audio input
-def callback(indata, frames, time, status):
-    if status:
-        st.error(status)
-    audio_queue.put(indata)
-
-# Function to resize image
-def resize_image(image, target_size):
-    img_ratio = image.width / image.height
-    target_width, target_height = target_size
-    if img_ratio > 1:
-        new_width = target_width
-        new_height = int(target_width / img_ratio)
-    else:
-        new_height = target_height
-        new_width = int(target_height * img_ratio)
-    return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-# Real-time recognition and keyword detection function
-def real_time_recognition():
-    with sd.RawInputStream(samplerate=samplerate, blocksize=int(samplerate * duration), dtype='int16',
-                           channels=1, callback=callback):
-        while True:
-            audio_chunk = audio_queue.get()
-            audio_data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
-
-            segments, info = model.transcribe(audio_data, beam_size=5, language='en')
-            for segment in segments:
-                text = segment.text
-                gui_queue.put({"text": text, "type": "transcription"})
-                keywords = extract_keywords(text)
-                gui_queue.put({"keywords": keywords, "type": "keywords"})
-
-                for keyword in keywords:
-                    if keyword in keyword_image_map:
-                        gui_queue.put({"image": keyword_image_map[keyword], "type": "image"})
+keyword_image_map, plan_keywords = split_keyword_map(load_keyword_image_map('keywords.json'))
+
+# Function to decode and resize an image for display
+def render_image(image_path):
+    return resize_image(Image.open(image_path), (300, 300))
+
+# Background renderer for upcoming images, shared across reruns
+@st.cache_resource
+def get_prefetcher():
+    return ImagePrefetcher(render_image)
+
+prefetcher = get_prefetcher()
+
+# One recognition engine per server process, shared across reruns; this page
+# is just one subscriber to its events (see engine.py for the headless runner)
+@st.cache_resource
+def get_engine():
+    return Engine(model, nlp, keyword_image_map, plan_keywords, prefetcher=prefetcher,
+                  samplerate=samplerate, duration=duration)
+
+engine = get_engine()
 
 # Directory to store uploaded images
 UPLOAD_FOLDER = "uploaded_images"
@@ -132,7 +104,7 @@ st.title("🎓 Interactive Learning Assistant")
 uploaded_json = st.file_uploader("Upload custom keyword-image mapping (JSON)", type="json")
 if uploaded_json:
     try:
-        keyword_image_map = json.load(uploaded_json)
+        keyword_image_map, plan_keywords = split_keyword_map(json.load(uploaded_json))
         st.success("Custom keyword-image mapping loaded successfully.")
     except json.JSONDecodeError:
         st.error("Failed to load the JSON file. Please ensure it is in the correct format.")
@@ -169,8 +141,9 @@ if st.button("Save Dataset to JSON"):
     else:
         st.warning("No data to save. Please add images and keywords first.")
 
-# Start and stop buttons for audio recording
+# Start, pause and stop buttons for audio recording
 start_button = st.button("🎙 Start Recording")
+pause_button = st.button("⏸ Pause / Resume")
 stop_button = st.button("🛑 Stop Recording")
 
 # Initialize progress bar and status
@@ -182,22 +155,33 @@ transcription_area = st.empty()
 keywords_area = st.empty()
 image_area = st.empty()
 
-# Recording state
-recording = False
+# Subscribe before handling the buttons so events flushed on stop are shown
+events = engine.subscribe()
 
 if start_button:
-    recording = True
-    threading.Thread(target=real_time_recognition, daemon=True).start()
-    status_text.success("Recording started! Speak now.")
+    engine.configure(keyword_image_map, plan_keywords)
+    if engine.start():
+        status_text.success("Recording started! Speak now.")
+
+if pause_button and engine.is_recording():
+    if engine.is_paused():
+        engine.resume()
+        status_text.success("Recording resumed.")
+    else:
+        engine.pause()
+        status_text.info("Recording paused.")
 
 if stop_button:
-    recording = False
+    engine.stop()
     status_text.info("Recording stopped.")
 
 # Continuously update the UI during recording
-while recording:
-    if not gui_queue.empty():
-        data = gui_queue.get()
+try:
+    while engine.is_recording() or not events.empty():
+        try:
+            data = events.get(timeout=0.1)
+        except queue.Empty:
+            data = {"type": "idle"}
         if data["type"] == "transcription":
             transcription_area.markdown(f"*Transcribed Text:*\n{data['text']}", unsafe_allow_html=True)
         elif data["type"] == "keywords":
@@ -205,14 +189,15 @@ while recording:
         elif data["type"] == "image":
             image_path = data["image"]
             if os.path.exists(image_path):
-                img = Image.open(image_path)
-                img_resized = resize_image(img, (300, 300))
+                img_resized = prefetcher.get(image_path)
                 image_area.image(img_resized, caption="Keyword Image", use_column_width=True)
             else:
                 image_area.error(f"Image not found: {image_path}")
-    
-    # Update progress bar for visual feedback
-    progress = (time.time() % 5) / 5  # Cycles every 5 seconds
-    progress_bar.progress(progress)
-    time.sleep(0.1)
-
+        elif data["type"] in ("status", "error"):
+            status_text.warning(data.get("status") or data.get("error"))
+
+        # Update progress bar for visual feedback
+        progress = (time.time() % 5) / 5  # Cycles every 5 seconds
+        progress_bar.progress(progress)
+finally:
+    engine.unsubscribe(events)
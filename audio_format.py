@@ -0,0 +1,16 @@
+import numpy as np
+
+# Default audio stream parameters
+SAMPLERATE = 16000
+DURATION = 5
+
+
+# Function to convert a raw int16 chunk into float32 samples in [-1, 1).
+# Interleaved multi-channel chunks are split into a (channels, samples) array.
+def chunk_to_float32(audio_chunk, channels=1):
+    samples = np.frombuffer(audio_chunk, dtype=np.int16)
+    if channels == 1:
+        return samples.astype(np.float32) / 32768.0
+    audio = samples.reshape(-1, channels).T.astype(np.float32, order='C')
+    audio /= 32768.0
+    return audio
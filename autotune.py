@@ -0,0 +1,201 @@
+import argparse
+import os
+import re
+import sys
+import time
+import ctranslate2
+from concurrent.futures import ThreadPoolExecutor
+from faster_whisper import WhisperModel, decode_audio
+from jiwer import wer
+from whisper_profile import DEFAULT_PROFILE, PROFILE_FILE, save_whisper_profile
+
+# Reference clip and transcript used when none are given (see wer.py)
+REFERENCE_CLIP = "How AI Could Save (Not Destroy) Education  Sal Khan  TED.mp3"
+
+SAMPLERATE = 16000
+# How far --max-seconds may run past the located end of the reference
+END_TOLERANCE_SECONDS = 1.0
+
+
+# Function to parse a comma-separated option into a list
+def split_option(value, cast=str):
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+# Default cpu_threads candidates: a quarter, half and all of the local cores
+def default_cpu_threads():
+    cores = os.cpu_count() or 1
+    return sorted({max(1, cores // 4), max(1, cores // 2), cores})
+
+
+# Function to normalise a transcript before computing WER
+def normalize(text):
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+
+def transcribe(model, audio):
+    segments, info = model.transcribe(audio, beam_size=5, language='en')
+    return " ".join(segment.text for segment in segments)
+
+
+# Function to benchmark one configuration. `streams` clips are transcribed
+# concurrently, as they would be with that many rooms or channels; the
+# real-time factor is the wall time divided by the clip duration.
+def benchmark(config, audio, reference, streams):
+    load_start = time.perf_counter()
+    model = WhisperModel(config["model_size"], device="cpu", compute_type=config["compute_type"],
+                         cpu_threads=config["cpu_threads"], num_workers=config["num_workers"])
+    load_time = time.perf_counter() - load_start
+
+    # Warm-up on the first few seconds so one-off allocations are not timed
+    transcribe(model, audio[:SAMPLERATE * 5])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=streams) as executor:
+        hypotheses = list(executor.map(lambda _: transcribe(model, audio), range(streams)))
+    elapsed = time.perf_counter() - start
+
+    del model
+    return {
+        "load_seconds": round(load_time, 3),
+        "realtime_factor": round(elapsed / (len(audio) / SAMPLERATE), 4),
+        "wer": round(wer(normalize(reference), normalize(hypotheses[0])), 4),
+    }
+
+
+# Function to find where the reference transcript ends in the clip. The clip is
+# transcribed with the default model until the text runs well past the reference;
+# the reference ends after the segment whose cumulative text matches it best.
+# Returns that end time and the (segment end, words so far) timeline.
+def locate_reference(audio, reference_words):
+    model = WhisperModel(DEFAULT_PROFILE["model_size"], device="cpu", compute_type=DEFAULT_PROFILE["compute_type"])
+    segments, info = model.transcribe(audio, beam_size=5, language='en')
+    reference_text = " ".join(reference_words)
+    words = []
+    timeline = []
+    best_error, best_end = None, None
+    for segment in segments:
+        words.extend(normalize(segment.text).split())
+        timeline.append((segment.end, list(words)))
+        error = wer(reference_text, " ".join(words))
+        if best_error is None or error < best_error:
+            best_error, best_end = error, segment.end
+        if len(words) > len(reference_words) * 1.25:
+            break
+    if best_end is None:
+        raise SystemExit("The reference clip contains no speech.")
+    return best_end, timeline
+
+
+# Function to cut the reference down to the words spoken before `seconds`,
+# using the calibration timeline to find the best matching reference prefix
+def cut_reference(reference_words, timeline, seconds):
+    spoken = []
+    for end, words in timeline:
+        if end > seconds:
+            break
+        spoken = words
+    spoken_text = " ".join(spoken)
+    best = min(range(1, len(reference_words) + 1),
+               key=lambda count: wer(" ".join(reference_words[:count]), spoken_text))
+    return reference_words[:best]
+
+
+# Function to choose the span of audio and reference text that the benchmark
+# scores, so that both cover the same part of the clip
+def benchmark_span(parser, args, audio, reference):
+    reference_words = normalize(reference).split()
+    clip_seconds = len(audio) / SAMPLERATE
+    timeline = None
+
+    if args.reference_seconds:
+        reference_end = args.reference_seconds
+    else:
+        reference_end, timeline = locate_reference(audio, reference_words)
+        print(f"Reference transcript ends at {reference_end:.1f}s of the clip")
+    if reference_end > clip_seconds + END_TOLERANCE_SECONDS:
+        parser.error(f"the reference ends at {reference_end:.1f}s but the clip is only {clip_seconds:.1f}s long")
+
+    seconds = reference_end
+    if args.max_seconds:
+        if args.max_seconds > reference_end + END_TOLERANCE_SECONDS:
+            parser.error(f"--max-seconds {args.max_seconds:g} is past the end of the reference transcript "
+                         f"({reference_end:.1f}s); the extra audio would be scored as insertions")
+        if args.max_seconds < reference_end:
+            if timeline is None:
+                reference_end, timeline = locate_reference(audio, reference_words)
+            reference_words = cut_reference(reference_words, timeline, args.max_seconds)
+            seconds = args.max_seconds
+
+    return audio[:int(seconds * SAMPLERATE)], " ".join(reference_words)
+
+
+# Function to pick the fastest configuration that is real-time and accurate enough
+def pick_best(results, target_wer, max_realtime_factor):
+    passing = [result for result in results
+               if result["wer"] <= target_wer and result["realtime_factor"] <= max_realtime_factor]
+    return min(passing, key=lambda result: result["realtime_factor"]) if passing else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WhisperModel CPU settings on this machine and save the fastest real-time profile.")
+    parser.add_argument("--clip", default=REFERENCE_CLIP, help="reference audio clip")
+    parser.add_argument("--reference", help="text file with the clip's transcript (default: the transcript in wer.py)")
+    parser.add_argument("--reference-seconds", type=float,
+                        help="where the reference transcript ends in the clip (default: located with a calibration pass)")
+    parser.add_argument("--max-seconds", type=float,
+                        help="only use the first N seconds of the clip; the reference is cut to match")
+    parser.add_argument("--model-sizes", default="tiny,base,small", help="comma-separated model sizes")
+    parser.add_argument("--compute-types", default="int8,int8_float32,float32", help="comma-separated compute types")
+    parser.add_argument("--cpu-threads", help="comma-separated cpu_threads values (default: 1/4, 1/2 and all cores)")
+    parser.add_argument("--num-workers", help="comma-separated num_workers values (default: 1 and --streams)")
+    parser.add_argument("--streams", type=int, default=1, help="concurrent transcriptions the profile must sustain")
+    parser.add_argument("--target-wer", type=float, default=0.15, help="maximum acceptable word error rate")
+    parser.add_argument("--max-realtime-factor", type=float, default=0.5,
+                        help="maximum processing time per second of audio, leaving headroom for the rest of the pipeline")
+    parser.add_argument("--output", default=PROFILE_FILE, help="where to save the chosen profile")
+    args = parser.parse_args(argv)
+
+    if args.reference:
+        with open(args.reference, 'r') as f:
+            reference = f.read()
+    else:
+        from wer import reference
+
+    audio, reference = benchmark_span(parser, args, decode_audio(args.clip, sampling_rate=SAMPLERATE), reference)
+
+    cpu_threads = split_option(args.cpu_threads, int) if args.cpu_threads else default_cpu_threads()
+    num_workers = split_option(args.num_workers, int) if args.num_workers else sorted({1, args.streams})
+
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    compute_types = [compute_type for compute_type in split_option(args.compute_types) if compute_type in supported]
+    for compute_type in set(split_option(args.compute_types)) - set(compute_types):
+        print(f"Skipping compute type {compute_type}: not supported on this CPU")
+
+    results = []
+    for model_size in split_option(args.model_sizes):
+        for compute_type in compute_types:
+            for threads in cpu_threads:
+                for workers in num_workers:
+                    config = {"model_size": model_size, "device": "cpu", "compute_type": compute_type,
+                              "cpu_threads": threads, "num_workers": workers}
+                    config.update(benchmark(config, audio, reference, args.streams))
+                    results.append(config)
+                    print(f"{model_size:>8} {compute_type:>14} threads={threads:<3} workers={workers:<2} "
+                          f"rtf={config['realtime_factor']:.3f} wer={config['wer'] * 100:.2f}%")
+
+    best = pick_best(results, args.target_wer, args.max_realtime_factor)
+    if best is None:
+        print(f"No configuration reached WER <= {args.target_wer * 100:.1f}% "
+              f"at real-time factor <= {args.max_realtime_factor}; profile not saved.")
+        return 1
+
+    save_whisper_profile(best, args.output)
+    print(f"Saved {best['model_size']}/{best['compute_type']} threads={best['cpu_threads']} "
+          f"workers={best['num_workers']} to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
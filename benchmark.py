@@ -0,0 +1,175 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import spacy
+from PIL import Image
+from audio_format import DURATION, SAMPLERATE, chunk_to_float32
+from keyword_matching import extract_keywords, load_keyword_image_map, match_images
+from lecture_plan import resize_image, split_keyword_map
+from wer import reference
+
+BASELINE_FILE = "benchmark_baseline.json"
+IMAGE_FOLDER = "uploaded_images"
+
+# Allowed slowdown of a component's median over its baseline before the run fails
+DEFAULT_THRESHOLD = 0.25
+
+
+# Function to time fn: warm-up calls first, then `repeats` samples of `number`
+# calls each with the garbage collector off. Returns per-call percentiles in ms.
+def measure(fn, warmup=3, repeats=20, number=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter_ns() - start) / number / 1e6)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 4),
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p90_ms": round(percentile(samples, 90), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "repeats": repeats,
+        "number": number,
+    }
+
+
+# Function to take a linearly interpolated percentile of sorted samples
+def percentile(samples, q):
+    position = (len(samples) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(samples) - 1)
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+
+# Function to build a keyword map of the given size that still contains the real keywords
+def synthetic_keyword_map(size, keyword_image_map):
+    keyword_map = dict(list(keyword_image_map.items())[:size])
+    index = 0
+    while len(keyword_map) < size:
+        keyword_map[f"topic{index}"] = f"topic{index}.png"
+        index += 1
+    return keyword_map
+
+
+# Each benchmark is (name, fn, options); fn is called with no arguments
+def build_benchmarks(tmpdir):
+    benchmarks = []
+
+    chunk = np.random.default_rng(0).integers(-32768, 32767, SAMPLERATE * DURATION, dtype=np.int16).tobytes()
+    benchmarks.append(("int16_to_float32_chunk", lambda: chunk_to_float32(chunk), {"number": 20}))
+    chunk_4ch = np.random.default_rng(0).integers(-32768, 32767, SAMPLERATE * DURATION * 4, dtype=np.int16).tobytes()
+    benchmarks.append(("int16_to_float32_chunk_4ch", lambda: chunk_to_float32(chunk_4ch, 4), {"number": 5}))
+
+    keyword_image_map, _ = split_keyword_map(load_keyword_image_map("keywords.json"))
+    nlp = spacy.load("en_core_web_sm")
+    benchmarks.append(("extract_keywords_reference", lambda: extract_keywords(nlp, reference), {"repeats": 10}))
+
+    keywords = extract_keywords(nlp, reference)
+    for label, size in (("10", 10), ("1k", 1000), ("100k", 100000)):
+        keyword_map = synthetic_keyword_map(size, keyword_image_map)
+        benchmarks.append((f"match_exact_{label}", lambda keyword_map=keyword_map: match_images(keywords, keyword_map),
+                           {"number": 10}))
+        benchmarks.append((f"match_substring_{label}",
+                           lambda keyword_map=keyword_map: match_images(keywords, keyword_map, substring_match=True),
+                           {"warmup": 1, "repeats": 5 if size >= 100000 else 20}))
+
+    for image_path in sorted(glob.glob(os.path.join(IMAGE_FOLDER, "*"))):
+        with Image.open(image_path) as image:
+            image.load()
+            decoded = image.copy()
+        name = os.path.splitext(os.path.basename(image_path))[0].lower().replace(" ", "_").replace("-", "_")
+        benchmarks.append((f"resize_image_{name}", lambda decoded=decoded: resize_image(decoded, (300, 300)),
+                           {"repeats": 10}))
+
+    large_map_file = os.path.join(tmpdir, "keywords_100k.json")
+    with open(large_map_file, "w") as f:
+        json.dump(synthetic_keyword_map(100000, keyword_image_map), f)
+    benchmarks.append(("load_keyword_map", lambda: load_keyword_image_map("keywords.json"), {"number": 50}))
+    benchmarks.append(("load_keyword_map_100k", lambda: load_keyword_image_map(large_map_file), {"repeats": 10}))
+
+    return benchmarks
+
+
+# Function to compare results with the baseline; returns the list of regressions
+def find_regressions(results, baseline, default_threshold):
+    thresholds = baseline.get("thresholds", {})
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        threshold = thresholds.get(name, thresholds.get("default", default_threshold))
+        result["baseline_p50_ms"] = base["p50_ms"]
+        # A zero median is below the timer's resolution and cannot be compared
+        if not base["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"]
+        result["change"] = round(ratio - 1, 4)
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio - 1, threshold))
+    return regressions
+
+
+def load_baseline(baseline_file):
+    try:
+        with open(baseline_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark the pipeline's hot paths and check them against a saved baseline.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown when the baseline has no threshold for a component")
+    parser.add_argument("--only", help="only run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, fn, options in build_benchmarks(tmpdir):
+            if args.only and args.only not in name:
+                continue
+            results[name] = measure(fn, **options)
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for name, result in results.items():
+        change = f"{result['change'] * 100:+.1f}%" if "change" in result else "(no baseline)"
+        print(f"{name:<36} p50={result['p50_ms']:>10.4f} ms  p90={result['p90_ms']:>10.4f} ms  {change}")
+
+    if args.save_baseline:
+        saved = {"thresholds": baseline.get("thresholds", {"default": args.threshold}),
+                 "results": dict(baseline.get("results", {}))}
+        for name, result in results.items():
+            saved["results"][name] = {key: result[key] for key in ("min_ms", "p50_ms", "p90_ms", "p99_ms")}
+        with open(args.baseline, 'w') as f:
+            json.dump(saved, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    for name, change, threshold in regressions:
+        print(f"REGRESSION {name}: median {change * 100:+.1f}% (threshold {threshold * 100:.0f}%)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import argparse
+import itertools
+import json
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+import spacy
+from concurrent.futures import ThreadPoolExecutor
+from aggregator import TranscriptAggregator
+from keyword_matching import extract_keyword_spans, extract_keywords, load_keyword_image_map, match_images
+from language import DEFAULT_LANGUAGE, LanguageSession, SpacyPipelines, language_keyword_maps
+from lecture_plan import LecturePlan, split_keyword_map
+from recorder import DURATION, MAX_EVENTS, SAMPLERATE, RecordingController, drain, put_latest
+from vad import ChannelVAD
+from whisper_profile import create_whisper_model, load_whisper_profile
+
+# How often idle connection handlers re-check whether the server is shutting down
+POLL_INTERVAL = 0.5
+
+
+# The recognition pipeline without any UI: capture, transcription, transcript
+# aggregation, keyword extraction and image matching. Every result is published
+# as an event dict to all subscribers; subscribe() returns a bounded queue.
+# With multilingual=True the language is detected per stream instead of forced to
+# English, and keywords are extracted and matched with that language's pipeline
+# and keyword map.
+class Engine:
+    def __init__(self, model, nlp, keyword_image_map, plan_keywords=(), substring_match=False, prefetcher=None,
+                 samplerate=SAMPLERATE, duration=DURATION, channels=1, multilingual=False, languages=None,
+                 language_maps=None):
+        self.model = model
+        self.pipelines = SpacyPipelines(nlp)
+        self.multilingual = multilingual
+        self.languages = languages
+        self.substring_match = substring_match
+        self.prefetcher = prefetcher
+        self.samplerate = samplerate
+        self.channels = channels
+        self.configure(keyword_image_map, plan_keywords, language_maps)
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._sequence = itertools.count()
+        # The chunk processor is built per session in start(), not here, since building
+        # it starts prefetching and spins up decoder threads
+        self.recorder = RecordingController(samplerate=samplerate, duration=duration, channels=channels,
+                                            publish=self.publish)
+
+    # Replace the keyword maps and lecture plan used by the next session
+    def configure(self, keyword_image_map, plan_keywords=(), language_maps=None):
+        self.keyword_image_map = keyword_image_map
+        self.plan_keywords = list(plan_keywords)
+        self.language_maps = dict(language_maps or {})
+        self.language_maps.setdefault(DEFAULT_LANGUAGE, keyword_image_map)
+
+    def subscribe(self, max_events=MAX_EVENTS):
+        events = queue.Queue(maxsize=max_events)
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events):
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+        drain(events)
+
+    # Send an event to every subscriber; slow subscribers lose their oldest events
+    def publish(self, event):
+        event = dict(event, seq=next(self._sequence), time=time.time())
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            put_latest(events, event)
+
+    def is_recording(self):
+        return self.recorder.is_recording()
+
+    def is_paused(self):
+        return self.recorder.is_paused()
+
+    def start(self):
+        if self.recorder.is_recording():
+            return False
+        process_chunk, finish = self.make_chunk_processor()
+        if self.recorder.start(process_chunk, finish):
+            self.publish({"state": "recording", "type": "state"})
+            return True
+        # Another start() won the race; release this session's decoder threads
+        finish(lambda event: None)
+        return False
+
+    def pause(self):
+        if self.is_recording() and not self.is_paused():
+            self.recorder.pause()
+            self.publish({"state": "paused", "type": "state"})
+
+    def resume(self):
+        if self.is_paused():
+            self.recorder.resume()
+            self.publish({"state": "recording", "type": "state"})
+
+    def stop(self, flush=True, timeout=None):
+        was_recording = self.is_recording()
+        stopped = self.recorder.stop(flush=flush, timeout=timeout)
+        if stopped and was_recording:
+            self.publish({"state": "stopped", "type": "state"})
+        return stopped
+
+    # Function to extract keywords from text using spaCy
+    def extract_keywords(self, text, language=None):
+        return extract_keywords(self.pipelines.get(language), text)
+
+    # Function to extract keywords along with their character offsets in the text
+    def extract_keyword_spans(self, text, language=None):
+        return extract_keyword_spans(self.pipelines.get(language), text)
+
+    # Match keywords with the keyword map of the given language
+    def match_images(self, keywords, language=None):
+        keyword_image_map = self.language_maps.get(language, self.keyword_image_map)
+        return match_images(keywords, keyword_image_map, self.substring_match)
+
+    # Real-time recognition and keyword detection, one processor per recording session.
+    # With several channels each one gets its own VAD and transcript, silent channels
+    # are skipped, and active ones are decoded in parallel against the shared model;
+    # results are published in capture order, then channel order, tagged by channel.
+    def make_chunk_processor(self):
+        channels = self.channels
+        sessions = [LanguageSession(self.languages) for _ in range(channels)] if self.multilingual else None
+
+        def language_of(channel):
+            return sessions[channel].language if sessions is not None else DEFAULT_LANGUAGE
+
+        aggregators = [TranscriptAggregator(lambda text, channel=channel: self.extract_keyword_spans(text, language_of(channel)))
+                       for channel in range(channels)]
+        plan = LecturePlan(self.plan_keywords, self.keyword_image_map)
+        vad = ChannelVAD(channels, self.samplerate) if channels > 1 else None
+        executor = ThreadPoolExecutor(max_workers=channels, thread_name_prefix="decoder") if channels > 1 else None
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(plan.upcoming())
+
+        def publish_commits(commits, publish, language):
+            for text, keywords in commits:
+                publish({"text": text, "type": "transcription"})
+
+                matched_images = self.match_images(keywords, language)
+
+                # With a lecture plan, show the match that best fits the lecture's progress
+                if plan and matched_images:
+                    matched_images = [plan.pick(matched_images)]
+                    plan.advance(matched_images[0])
+                    if self.prefetcher is not None:
+                        self.prefetcher.prefetch(plan.upcoming())
+
+                for image in matched_images:
+                    publish({"image": image, "upcoming": plan.upcoming(), "type": "image"})
+
+                publish({"keywords": keywords, "type": "keywords"})
+
+        def transcribe(audio_data, channel):
+            language = sessions[channel].transcribe_language() if sessions is not None else 'en'
+            # Room mics pick up long silences, so let Whisper's VAD trim them as well
+            segments, info = self.model.transcribe(audio_data, beam_size=5, language=language, vad_filter=channels > 1)
+            return list(segments), info
+
+        def tagged(publish, channel, captured_at):
+            return lambda event: publish(dict(event, channel=channel, captured_at=captured_at))
+
+        def process_chunk(audio_data, publish, captured_at):
+            if channels == 1:
+                results = [transcribe(audio_data, 0)]
+            else:
+                active = vad.update(audio_data)
+                futures = [executor.submit(transcribe, audio_data[channel], channel) if active[channel] else None
+                           for channel in range(channels)]
+                results = [future.result() if future is not None else None for future in futures]
+
+            for channel, result in enumerate(results):
+                channel_publish = tagged(publish, channel, captured_at)
+                segments = []
+                if result is not None:
+                    segments, info = result
+                    session = sessions[channel] if sessions is not None else None
+                    if session is not None and session.observe(segments, info):
+                        channel_publish({"language": session.language, "probability": session.probability,
+                                         "type": "language"})
+                language = language_of(channel)
+                for segment in segments:
+                    publish_commits(aggregators[channel].add(segment.text), channel_publish, language)
+                # Commit text that has been waiting too long, even if this chunk was silent
+                publish_commits(aggregators[channel].poll(), channel_publish, language)
+
+        def finish(publish):
+            if executor is not None:
+                executor.shutdown(wait=True)
+            captured_at = time.time()
+            for channel, aggregator in enumerate(aggregators):
+                publish_commits(aggregator.flush(), tagged(publish, channel, captured_at), language_of(channel))
+
+        return process_chunk, finish
+
+
+# Streams engine events to one socket client as newline-delimited JSON
+class EventStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        events = self.server.engine.subscribe()
+        try:
+            while not self.server.closing.is_set():
+                try:
+                    event = events.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.engine.unsubscribe(events)
+
+
+class UnixEventServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class TCPEventServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+# Function to serve engine events on a Unix socket and/or a localhost TCP port
+def serve_events(engine, unix_socket=None, port=None):
+    servers = []
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        servers.append(UnixEventServer(unix_socket, EventStreamHandler))
+    if port:
+        servers.append(TCPEventServer(("127.0.0.1", port), EventStreamHandler))
+    for server in servers:
+        server.engine = engine
+        server.closing = threading.Event()
+        threading.Thread(target=server.serve_forever, name="event-server", daemon=True).start()
+    return servers
+
+
+def close_servers(servers):
+    for server in servers:
+        server.closing.set()
+        server.shutdown()
+        server.server_close()
+        if isinstance(server, UnixEventServer) and os.path.exists(server.server_address):
+            os.remove(server.server_address)
+
+
+# Function to write engine events to stdout as newline-delimited JSON until done is set
+def print_events(events, done):
+    while not done.is_set() or not events.empty():
+        try:
+            event = events.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        sys.stdout.write(json.dumps(event) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the recognition pipeline headless and stream its events as newline-delimited JSON.")
+    parser.add_argument("--keywords", default="keywords.json", help="keyword-image mapping (JSON)")
+    parser.add_argument("--channels", type=int, default=1, help="input channels to capture and decode separately")
+    parser.add_argument("--multilingual", action="store_true", help="detect the language per session instead of forcing English")
+    parser.add_argument("--languages", help="comma-separated languages to restrict detection to, e.g. en,es")
+    parser.add_argument("--substring-match", action="store_true", help="also match keywords that are substrings of map keys")
+    parser.add_argument("--socket", help="serve events on this Unix socket path")
+    parser.add_argument("--port", type=int, help="serve events on this localhost TCP port")
+    parser.add_argument("--no-stdout", action="store_true", help="do not print events on stdout")
+    args = parser.parse_args(argv)
+
+    keyword_data = load_keyword_image_map(args.keywords)
+    keyword_image_map, plan_keywords = split_keyword_map(keyword_data)
+    languages = [language.strip() for language in args.languages.split(",")] if args.languages else None
+    # Each channel decodes in parallel, which needs a model worker per channel
+    profile = load_whisper_profile()
+    if profile["num_workers"] < args.channels:
+        print(f"num_workers {profile['num_workers']} in the Whisper profile would serialize {args.channels} channels; "
+              f"using {args.channels} (run autotune.py --streams {args.channels} to tune for this)", file=sys.stderr)
+        profile = dict(profile, num_workers=args.channels)
+    engine = Engine(create_whisper_model(profile), spacy.load("en_core_web_sm"),
+                    keyword_image_map, plan_keywords, substring_match=args.substring_match, channels=args.channels,
+                    multilingual=args.multilingual, languages=languages,
+                    language_maps=language_keyword_maps(keyword_data))
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    printer = None
+    printer_done = threading.Event()
+    if not args.no_stdout:
+        printer = threading.Thread(target=print_events, args=(engine.subscribe(), printer_done), daemon=True)
+        printer.start()
+    servers = serve_events(engine, args.socket, args.port)
+
+    engine.start()
+    while not stop_event.wait(POLL_INTERVAL):
+        if not engine.is_recording():
+            # The capture thread died, e.g. the input device went away
+            stop_event.set()
+    engine.stop()
+
+    printer_done.set()
+    if printer is not None:
+        printer.join()
+    close_servers(servers)
+    return 0 if engine.recorder.error is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import json
+import sys
+
+# Parts of speech that count as keywords
+KEYWORD_POS = ("NOUN", "PROPN")
+
+
+# Function to load keyword-image mapping outside Streamlit
+def load_keyword_image_map(config_file):
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"The file {config_file} was not found.", file=sys.stderr)
+    except json.JSONDecodeError:
+        print(f"The file {config_file} is not a valid JSON.", file=sys.stderr)
+    return {}
+
+
+# Function to extract keywords from text with a spaCy pipeline
+def extract_keywords(nlp, text):
+    return [token.text for token in nlp(text) if token.pos_ in KEYWORD_POS]
+
+
+# Function to extract keywords along with their character offsets in the text
+def extract_keyword_spans(nlp, text):
+    return [(token.idx, token.text) for token in nlp(text) if token.pos_ in KEYWORD_POS]
+
+
+# Match keywords with JSON entries (case-sensitive), exactly or as substrings of each other
+def match_images(keywords, keyword_image_map, substring_match=False):
+    if not substring_match:
+        return [keyword_image_map[keyword] for keyword in keywords if keyword in keyword_image_map]
+    matched_images = []
+    for keyword in keywords:
+        for json_key in keyword_image_map.keys():
+            if json_key in keyword or keyword in json_key:
+                matched_images.append(keyword_image_map[json_key])
+    return matched_images
@@ -0,0 +1,102 @@
+import threading
+import spacy
+
+# spaCy pipelines used for keyword extraction in each language
+SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "de": "de_core_news_sm",
+    "es": "es_core_news_sm",
+    "fr": "fr_core_news_sm",
+    "it": "it_core_news_sm",
+    "nl": "nl_core_news_sm",
+    "pt": "pt_core_news_sm",
+    "zh": "zh_core_web_sm",
+    "ja": "ja_core_news_sm",
+}
+
+DEFAULT_LANGUAGE = "en"
+# Mean segment log-probability below which a chunk counts as a possible language drift
+DRIFT_LOGPROB = -1.0
+# Consecutive drifting chunks before the language is detected again
+DRIFT_CHUNKS = 3
+
+
+# Function to read the per-language keyword maps from a loaded keyword map.
+# {"languages": {"es": {"colina": "HILL CLIMBING.png"}}} adds a Spanish index
+# pointing at the same images as the default keywords.
+def language_keyword_maps(data):
+    languages = data.get("languages", {})
+    return {language: keyword_map for language, keyword_map in languages.items() if isinstance(keyword_map, dict)}
+
+
+# Loads spaCy pipelines the first time a language is needed. Languages without
+# an installed pipeline fall back to the default one, and the fallback is cached
+# so a missing model is only looked up once.
+class SpacyPipelines:
+    def __init__(self, default_nlp, default_language=DEFAULT_LANGUAGE):
+        self.default_language = default_language
+        self._lock = threading.Lock()
+        self._pipelines = {default_language: default_nlp}
+
+    def get(self, language):
+        language = language or self.default_language
+        nlp = self._pipelines.get(language)
+        if nlp is not None:
+            return nlp
+        with self._lock:
+            if language not in self._pipelines:
+                try:
+                    self._pipelines[language] = spacy.load(SPACY_MODELS[language])
+                except (KeyError, OSError):
+                    self._pipelines[language] = self._pipelines[self.default_language]
+            return self._pipelines[language]
+
+
+# Language of one audio stream. Whisper detects the language only when
+# transcribe_language() is None, i.e. on the first chunk and after a drift signal;
+# every other chunk is transcribed with the cached language and pays nothing extra.
+class LanguageSession:
+    def __init__(self, languages=None, drift_logprob=DRIFT_LOGPROB, drift_chunks=DRIFT_CHUNKS):
+        self.languages = list(languages) if languages else None
+        self.drift_logprob = drift_logprob
+        self.drift_chunks = drift_chunks
+        self.language = None
+        self.probability = 0.0
+        self.needs_detection = True
+        self._drifting = 0
+
+    # Language to pass to WhisperModel.transcribe, None to let Whisper detect it
+    def transcribe_language(self):
+        return None if self.needs_detection else self.language
+
+    # Update from a transcription of one chunk; returns True when the language was (re)detected
+    def observe(self, segments, info):
+        if self.needs_detection:
+            # Whisper's guess on silence is meaningless, keep detecting until someone speaks
+            if not segments:
+                return False
+            self.language, self.probability = self._pick(info)
+            self.needs_detection = False
+            self._drifting = 0
+            return True
+
+        if not segments:
+            return False
+        mean_logprob = sum(segment.avg_logprob for segment in segments) / len(segments)
+        if mean_logprob < self.drift_logprob:
+            self._drifting += 1
+            if self._drifting >= self.drift_chunks:
+                # Detect again on the next chunk
+                self.needs_detection = True
+        else:
+            self._drifting = 0
+        return False
+
+    # Restrict Whisper's detection to the configured languages
+    def _pick(self, info):
+        if self.languages is None or info.language in self.languages:
+            return info.language, info.language_probability
+        for language, probability in info.all_language_probs or []:
+            if language in self.languages:
+                return language, probability
+        return self.languages[0], 0.0
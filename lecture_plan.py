@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from PIL import Image
+
+# Number of upcoming plan images to keep pre-rendered
+PREFETCH_AHEAD = 2
+# Pre-rendered images kept in memory
+MAX_CACHED_IMAGES = 8
+# Consecutive matches of the same image before the lecture jumps to it, when that
+# image is earlier in the plan or more than one step ahead
+JUMP_MATCHES = 2
+
+
+# Function to split a loaded keyword map into (keyword_image_map, plan).
+# Accepts the flat {"keyword": "image"} format as well as
+# {"keywords": {"keyword": "image"}, "plan": ["keyword", ...]}.
+def split_keyword_map(data):
+    if isinstance(data.get("keywords"), dict):
+        return data["keywords"], list(data.get("plan", []))
+    return data, []
+
+
+# Function to resize image
+def resize_image(image, target_size):
+    img_ratio = image.width / image.height
+    target_width, target_height = target_size
+    if img_ratio > 1:
+        new_width = target_width
+        new_height = int(target_width / img_ratio)
+    else:
+        new_height = target_height
+        new_width = int(target_height * img_ratio)
+    return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+
+# Ordered lecture plan over the images of a keyword map. Tracks how far the
+# lecture has got, predicts the next images and breaks ties between matches.
+class LecturePlan:
+    def __init__(self, plan, keyword_image_map, jump_matches=JUMP_MATCHES):
+        self.images = []
+        for entry in plan:
+            image = keyword_image_map.get(entry, entry)
+            if image not in self.images:
+                self.images.append(image)
+        self.position = -1
+        self.jump_matches = jump_matches
+        self._jump = None
+        self._jump_count = 0
+
+    def __bool__(self):
+        return bool(self.images)
+
+    # Move the lecture to the given image. The current and next image are taken
+    # straight away; a passing mention of an earlier or much later topic ("later
+    # we'll cover minimax") does not move the lecture, only repeated matches do.
+    def advance(self, image):
+        if image not in self.images:
+            return
+        index = self.images.index(image)
+        if self.position <= index <= self.position + 1:
+            self._move(index)
+            return
+        if index == self._jump:
+            self._jump_count += 1
+        else:
+            self._jump = index
+            self._jump_count = 1
+        if self._jump_count >= self.jump_matches:
+            self._move(index)
+
+    def _move(self, index):
+        self.position = index
+        self._jump = None
+        self._jump_count = 0
+
+    # The next images the lecture is expected to reach
+    def upcoming(self, count=PREFETCH_AHEAD):
+        return self.images[self.position + 1:self.position + 1 + count]
+
+    # Pick the candidate closest to the current position, preferring the
+    # current and upcoming images over earlier ones and unplanned ones last
+    def pick(self, candidates):
+        def rank(image):
+            if image not in self.images:
+                return (2, 0)
+            distance = self.images.index(image) - max(self.position, 0)
+            if distance >= 0:
+                return (0, distance)
+            return (1, -distance)
+        return min(candidates, key=rank) if candidates else None
+
+
+# Renders images in the background and keeps a small LRU cache of the results.
+# render(image_path) does the decode and resize; get() returns the cached
+# result, waits for an in-flight render, or renders synchronously.
+class ImagePrefetcher:
+    def __init__(self, render, max_images=MAX_CACHED_IMAGES):
+        self.render = render
+        self.max_images = max_images
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-prefetch")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    def prefetch(self, image_paths):
+        with self._lock:
+            for image_path in image_paths:
+                if image_path in self._cache:
+                    self._cache.move_to_end(image_path)
+                else:
+                    self._cache[image_path] = self._executor.submit(self.render, image_path)
+                    self._evict()
+
+    def get(self, image_path):
+        with self._lock:
+            future = self._cache.get(image_path)
+            if future is not None:
+                self._cache.move_to_end(image_path)
+        if future is None:
+            # Not predicted: render on the caller's thread rather than queueing
+            # behind prefetches, then keep the result for next time
+            rendered = self.render(image_path)
+            future = Future()
+            future.set_result(rendered)
+            with self._lock:
+                self._cache[image_path] = future
+                self._evict()
+            return rendered
+        try:
+            return future.result()
+        except CancelledError:
+            # Evicted before it ran
+            return self.render(image_path)
+        except Exception:
+            # Drop failed renders so a later call can retry
+            with self._lock:
+                if self._cache.get(image_path) is future:
+                    del self._cache[image_path]
+            raise
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._cache.clear()
+
+    def _evict(self):
+        while len(self._cache) > self.max_images:
+            image_path, future = self._cache.popitem(last=False)
+            future.cancel()
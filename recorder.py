@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+import sounddevice as sd
+from audio_format import DURATION, SAMPLERATE, chunk_to_float32
+
+# Audio is captured in short blocks and assembled into chunks of DURATION seconds,
+# so stopping loses at most one block of audio that was not delivered yet
+BLOCK_SECONDS = 0.5
+
+# Bounded queue sizes: a few chunks of audio and a few hundred UI events at most
+MAX_AUDIO_CHUNKS = 4
+MAX_EVENTS = 256
+
+
+# Function to put an item on a bounded queue, dropping the oldest item when full
+def put_latest(q, item):
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+# Function to drain every pending item from a queue
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+# Owns the capture thread, the input stream and the audio/event queues.
+# process_chunk(audio_data, publish, captured_at) is called on the worker thread
+# for every captured chunk, with the wall-clock time the chunk started; audio_data
+# is a (channels, samples) array when capturing more than one channel.
+# publish(event) puts an event on the bounded events queue.
+# on_stop(publish), if given, is called on the worker thread once capture ends.
+# Both can be left out here and passed to start() for each session instead.
+# Pass publish to send events somewhere other than the controller's own queue.
+class RecordingController:
+    def __init__(self, process_chunk=None, on_stop=None, samplerate=SAMPLERATE, duration=DURATION, channels=1,
+                 max_audio_chunks=MAX_AUDIO_CHUNKS, max_events=MAX_EVENTS, publish=None):
+        self.process_chunk = process_chunk
+        self.on_stop = on_stop
+        self.samplerate = samplerate
+        self.duration = duration
+        self.channels = channels
+        self.blocksize = min(int(samplerate * BLOCK_SECONDS), int(samplerate * duration))
+        self.chunk_frames = int(samplerate * duration)
+        blocks_per_chunk = -(-self.chunk_frames // self.blocksize)
+        self.audio_queue = queue.Queue(maxsize=max_audio_chunks * blocks_per_chunk)
+        self.events = queue.Queue(maxsize=max_events)
+        if publish is not None:
+            self.publish = publish
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+        self._flush = True
+        self.error = None
+
+    def is_recording(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_paused(self):
+        return self.is_recording() and self._paused.is_set()
+
+    def publish(self, event):
+        put_latest(self.events, event)
+
+    # Start capturing, optionally with a new processor for this session;
+    # does nothing if a capture thread is already running
+    def start(self, process_chunk=None, on_stop=None):
+        with self._lock:
+            if self.is_recording():
+                return False
+            if process_chunk is not None:
+                self.process_chunk = process_chunk
+                self.on_stop = on_stop
+            if self.process_chunk is None:
+                raise ValueError("RecordingController.start() needs a process_chunk function")
+            drain(self.audio_queue)
+            drain(self.events)
+            self.error = None
+            self._stop_event.clear()
+            self._paused.clear()
+            self._thread = threading.Thread(target=self._run, name="recording-controller", daemon=True)
+            self._thread.start()
+            return True
+
+    # Pause keeps the device open but drops incoming audio
+    def pause(self):
+        if self.is_recording():
+            self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    # Stop capturing, release the device and join the worker thread.
+    # With flush=True audio already captured, including a final partial chunk,
+    # is still processed before exit.
+    def stop(self, flush=True, timeout=None):
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return True
+            self._flush = flush
+            self._stop_event.set()
+            self._paused.clear()
+        thread.join(timeout)
+        if thread.is_alive():
+            return False
+        with self._lock:
+            if self._thread is thread:
+                self._thread = None
+        drain(self.audio_queue)
+        return True
+
+    # Callback function to capture audio input
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.publish({"status": str(status), "type": "status"})
+        if self._stop_event.is_set() or self._paused.is_set():
+            return
+        captured_at = time.time() - frames / self.samplerate
+        put_latest(self.audio_queue, (captured_at, bytes(indata)))
+
+    # Process one chunk assembled from (captured_at, bytes) blocks. A failing
+    # chunk is reported as an error event and does not end the session.
+    def _handle(self, blocks):
+        captured_at = blocks[0][0]
+        audio_chunk = b"".join(block for _, block in blocks)
+        try:
+            self.process_chunk(chunk_to_float32(audio_chunk, self.channels), self.publish, captured_at)
+        except Exception as e:
+            self.publish({"error": str(e), "type": "error"})
+
+    def _run(self):
+        blocks = []
+        frame_bytes = 2 * self.channels
+
+        # Add a block to the current chunk and process the chunk once it is full
+        def collect(block):
+            blocks.append(block)
+            if sum(len(data) for _, data in blocks) // frame_bytes >= self.chunk_frames:
+                self._handle(blocks[:])
+                blocks.clear()
+
+        try:
+            with sd.RawInputStream(samplerate=self.samplerate, blocksize=self.blocksize,
+                                   dtype='int16', channels=self.channels, callback=self._callback):
+                while not self._stop_event.is_set():
+                    try:
+                        block = self.audio_queue.get(timeout=0.2)
+                    except queue.Empty:
+                        continue
+                    collect(block)
+            # The stream is closed here, so the device is already released
+            if self._flush:
+                for block in drain(self.audio_queue):
+                    collect(block)
+                if blocks:
+                    self._handle(blocks)
+        except Exception as e:
+            self.error = e
+            self.publish({"error": str(e), "type": "error"})
+        finally:
+            drain(self.audio_queue)
+            if self.on_stop is not None:
+                try:
+                    self.on_stop(self.publish)
+                except Exception as e:
+                    self.publish({"error": str(e), "type": "error"})
@@ -0,0 +1,25 @@
+import os
+import sys
+import types
+import pytest
+
+# The project is a set of top-level modules, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests replace RawInputStream with a fake, so a stand-in module is enough
+# where sounddevice or the PortAudio library it loads is not installed
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError):
+    sys.modules["sounddevice"] = types.ModuleType("sounddevice")
+
+# Imported only once sounddevice is importable
+import recorder  # noqa: E402
+from fakes import FakeStream  # noqa: E402
+
+
+@pytest.fixture
+def fake_stream(monkeypatch):
+    FakeStream.streams = []
+    monkeypatch.setattr(recorder.sd, "RawInputStream", FakeStream, raising=False)
+    return FakeStream
@@ -0,0 +1,42 @@
+import time
+import numpy as np
+
+
+# Stands in for sounddevice.RawInputStream; tests feed blocks through feed()
+class FakeStream:
+    streams = []
+
+    def __init__(self, samplerate, blocksize, dtype, channels, callback):
+        self.blocksize = blocksize
+        self.channels = channels
+        self.callback = callback
+        self.open = False
+        self.closed = False
+        FakeStream.streams.append(self)
+
+    def __enter__(self):
+        self.open = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self.open = False
+        self.closed = True
+
+    # value is one sample value for every channel or a list with one per channel
+    def feed(self, value=1):
+        block = np.empty((self.blocksize, self.channels), dtype=np.int16)
+        block[:] = value
+        self.callback(block.tobytes(), self.blocksize, None, None)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def open_stream():
+    wait_for(lambda: FakeStream.streams and FakeStream.streams[-1].open)
+    return FakeStream.streams[-1]
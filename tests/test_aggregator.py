@@ -0,0 +1,79 @@
+import re
+from aggregator import TranscriptAggregator
+
+KEYWORDS = re.compile(r"\b(hill|climbing|search|tree)\b")
+
+
+def extract_spans(text):
+    return [(match.start(), match.group()) for match in KEYWORDS.finditer(text)]
+
+
+def make_aggregator(**kwargs):
+    calls = []
+
+    def spans(text):
+        calls.append(text)
+        return extract_spans(text)
+
+    return TranscriptAggregator(spans, **kwargs), calls
+
+
+def test_commits_on_sentence_boundary():
+    aggregator, _ = make_aggregator()
+    assert aggregator.add("we use hill", now=0) == []
+    assert aggregator.add("climbing search. then", now=1) == [
+        ("we use hill climbing search.", ["hill", "climbing", "search"]),
+    ]
+    # Text after the boundary stays pending
+    assert aggregator.flush() == [("then", [])]
+
+
+def test_commits_after_time_limit_without_boundary():
+    aggregator, _ = make_aggregator(max_delay=4)
+    assert aggregator.add("a search tree", now=0) == []
+    assert aggregator.poll(now=3.9) == []
+    assert aggregator.poll(now=4) == [("a search tree", ["search", "tree"])]
+    assert aggregator.poll(now=10) == []
+
+
+def test_empty_chunk_still_triggers_time_limit():
+    aggregator, _ = make_aggregator(max_delay=2)
+    aggregator.add("hill", now=0)
+    assert aggregator.add("", now=2) == [("hill", ["hill"])]
+
+
+def test_overlap_is_reextracted_but_not_reported_twice():
+    aggregator, calls = make_aggregator(overlap_chars=20)
+    aggregator.add("we use hill climbing search.", now=0)
+    assert aggregator.add("then a tree.", now=1) == [("then a tree.", ["tree"])]
+    # The second extraction saw the tail of the first sentence as context
+    assert calls[1].endswith("climbing search. then a tree.")
+    assert "search" in calls[1]
+
+
+def test_same_keyword_in_new_text_is_reported_again():
+    aggregator, _ = make_aggregator(overlap_chars=80)
+    aggregator.add("hill.", now=0)
+    assert aggregator.add("hill again.", now=1) == [("hill again.", ["hill"])]
+
+
+def test_keyword_split_across_chunks_is_seen_together():
+    aggregator, calls = make_aggregator()
+    aggregator.add("today hill", now=0)
+    commits = aggregator.add("climbing.", now=1)
+    assert commits == [("today hill climbing.", ["hill", "climbing"])]
+    assert calls == ["today hill climbing."]
+
+
+def test_flush_commits_pending_text_once():
+    aggregator, _ = make_aggregator()
+    assert aggregator.flush() == []
+    aggregator.add("search tree", now=0)
+    assert aggregator.flush() == [("search tree", ["search", "tree"])]
+    assert aggregator.flush() == []
+
+
+def test_no_overlap_keeps_offsets_aligned():
+    aggregator, _ = make_aggregator(overlap_chars=0)
+    assert aggregator.add("hill.", now=0) == [("hill.", ["hill"])]
+    assert aggregator.add("hill.", now=1) == [("hill.", ["hill"])]
@@ -0,0 +1,93 @@
+import argparse
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import autotune
+from autotune import SAMPLERATE, benchmark_span, cut_reference, pick_best
+
+REFERENCE = "One two three, four five six. Seven eight nine ten."
+# Calibration timeline: (segment end, words heard so far)
+TIMELINE = [
+    (2.0, ["one", "two", "three"]),
+    (4.0, ["one", "two", "three", "four", "five", "six"]),
+    (6.0, ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]),
+    (8.0, ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "applause"]),
+]
+
+
+def clip(seconds):
+    return np.zeros(int(seconds * SAMPLERATE), dtype=np.float32)
+
+
+def span(seconds, reference_seconds=None, max_seconds=None):
+    args = SimpleNamespace(reference_seconds=reference_seconds, max_seconds=max_seconds)
+    return benchmark_span(argparse.ArgumentParser(), args, clip(seconds), REFERENCE)
+
+
+@pytest.fixture
+def calibration(monkeypatch):
+    calls = []
+
+    def locate_reference(audio, reference_words):
+        calls.append(len(audio))
+        return 6.0, TIMELINE
+
+    monkeypatch.setattr(autotune, "locate_reference", locate_reference)
+    return calls
+
+
+def test_cut_reference_keeps_words_spoken_before_cut():
+    words = autotune.normalize(REFERENCE).split()
+    assert cut_reference(words, TIMELINE, 4.5) == ["one", "two", "three", "four", "five", "six"]
+    assert cut_reference(words, TIMELINE, 2.0) == ["one", "two", "three"]
+    assert cut_reference(words, TIMELINE, 100) == words
+
+
+def test_span_stops_at_located_reference_end(calibration):
+    audio, reference = span(10)
+    assert len(audio) == 6 * SAMPLERATE
+    assert reference == "one two three four five six seven eight nine ten"
+    assert len(calibration) == 1
+
+
+def test_reference_seconds_skips_calibration(calibration):
+    audio, reference = span(10, reference_seconds=5)
+    assert len(audio) == 5 * SAMPLERATE
+    assert reference == autotune.normalize(REFERENCE)
+    assert calibration == []
+
+
+def test_shorter_max_seconds_cuts_the_reference(calibration):
+    audio, reference = span(10, reference_seconds=6, max_seconds=4)
+    assert len(audio) == 4 * SAMPLERATE
+    assert reference == "one two three four five six"
+    # The timeline is only needed to cut the reference
+    assert len(calibration) == 1
+
+
+def test_max_seconds_within_tolerance_of_reference_end_is_accepted(calibration):
+    audio, reference = span(10, max_seconds=6.5)
+    assert len(audio) == 6 * SAMPLERATE
+
+
+def test_max_seconds_past_reference_end_is_rejected(calibration):
+    with pytest.raises(SystemExit):
+        span(10, max_seconds=9)
+
+
+def test_reference_longer_than_clip_is_rejected(calibration):
+    with pytest.raises(SystemExit):
+        span(3, reference_seconds=6)
+
+
+def test_pick_best_returns_fastest_passing_configuration():
+    results = [
+        {"model_size": "tiny", "wer": 0.30, "realtime_factor": 0.05},
+        {"model_size": "base", "wer": 0.12, "realtime_factor": 0.20},
+        {"model_size": "small", "wer": 0.08, "realtime_factor": 0.40},
+        {"model_size": "medium", "wer": 0.05, "realtime_factor": 0.90},
+    ]
+    assert pick_best(results, 0.15, 0.5)["model_size"] == "base"
+    assert pick_best(results, 0.10, 0.5)["model_size"] == "small"
+    assert pick_best(results, 0.01, 0.5) is None
+    assert pick_best([], 0.15, 0.5) is None
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import pytest
+from benchmark import find_regressions, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE = {
+    "thresholds": {"default": 0.25, "resize_image_bfs": 0.5},
+    "results": {
+        "match_exact_1k": {"p50_ms": 1.0},
+        "resize_image_bfs": {"p50_ms": 2.0},
+        "load_keyword_map": {"p50_ms": 0.0},
+    },
+}
+
+
+def result(p50_ms):
+    return {"p50_ms": p50_ms, "p90_ms": p50_ms}
+
+
+def test_percentile_interpolates_between_samples():
+    samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(samples, 0) == 1.0
+    assert percentile(samples, 100) == 5.0
+    assert percentile(samples, 50) == 3.0
+    assert percentile(samples, 90) == pytest.approx(4.6)
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([1.0, 3.0], 50) == 2.0
+
+
+def test_default_threshold_from_baseline_applies_to_other_components():
+    results = {"match_exact_1k": result(1.3)}
+    assert find_regressions(results, BASELINE, default_threshold=0.9) == [("match_exact_1k", pytest.approx(0.3), 0.25)]
+    assert results["match_exact_1k"]["baseline_p50_ms"] == 1.0
+    assert results["match_exact_1k"]["change"] == pytest.approx(0.3)
+    assert find_regressions({"match_exact_1k": result(1.2)}, BASELINE, default_threshold=0.9) == []
+
+
+def test_component_threshold_overrides_default():
+    assert find_regressions({"resize_image_bfs": result(2.8)}, BASELINE, default_threshold=0.25) == []
+    regressions = find_regressions({"resize_image_bfs": result(3.2)}, BASELINE, default_threshold=0.25)
+    assert [(name, threshold) for name, _, threshold in regressions] == [("resize_image_bfs", 0.5)]
+
+
+def test_command_line_threshold_is_used_without_baseline_thresholds():
+    baseline = {"results": BASELINE["results"]}
+    assert find_regressions({"match_exact_1k": result(1.3)}, baseline, default_threshold=0.5) == []
+    assert len(find_regressions({"match_exact_1k": result(1.6)}, baseline, default_threshold=0.5)) == 1
+
+
+def test_zero_baseline_median_is_not_compared():
+    results = {"load_keyword_map": result(5.0)}
+    assert find_regressions(results, BASELINE, default_threshold=0.25) == []
+    assert "change" not in results["load_keyword_map"]
+
+
+def test_components_missing_from_baseline_are_skipped():
+    results = {"match_exact_100k": result(50.0)}
+    assert find_regressions(results, BASELINE, default_threshold=0.25) == []
+    assert "change" not in results["match_exact_100k"]
+    assert find_regressions(results, {}, default_threshold=0.25) == []
+
+
+def test_benchmark_does_not_load_audio_or_model_libraries():
+    # A fresh interpreter, since other tests import the recorder and engine
+    code = "import sys, benchmark; print(sorted(set(sys.modules) & {'sounddevice', 'faster_whisper', 'engine'}))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import socket
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from engine import Engine, close_servers, serve_events
+from fakes import open_stream, wait_for
+
+SAMPLERATE = 100
+DURATION = 1
+KEYWORD_IMAGE_MAP = {"hill": "HILL CLIMBING.png", "tree": "TREE.png"}
+
+
+# Stands in for a spaCy pipeline: every word is tagged as a noun
+class FakeNLP:
+    def __call__(self, text):
+        return [SimpleNamespace(text=match.group(), idx=match.start(), pos_="NOUN")
+                for match in re.finditer(r"\w+", text)]
+
+
+# Stands in for WhisperModel; text(audio_data) decides what each chunk says
+class FakeModel:
+    def __init__(self, text=lambda audio_data: "", language="en"):
+        self.text = text
+        self.language = language
+        self.calls = []
+
+    def transcribe(self, audio_data, beam_size=5, language=None, vad_filter=False):
+        self.calls.append({"language": language, "vad_filter": vad_filter})
+        text = self.text(audio_data)
+        segments = [SimpleNamespace(text=text, avg_logprob=-0.2)] if text else []
+        info = SimpleNamespace(language=language or self.language, language_probability=0.9, all_language_probs=None)
+        return iter(segments), info
+
+
+def make_engine(model=None, **kwargs):
+    return Engine(model or FakeModel(), FakeNLP(), KEYWORD_IMAGE_MAP, samplerate=SAMPLERATE, duration=DURATION,
+                  **kwargs)
+
+
+def event_types(events):
+    return [event["type"] for event in list(events.queue)]
+
+
+def test_publish_reaches_subscribers_until_unsubscribed():
+    engine = make_engine()
+    events = engine.subscribe()
+    engine.publish({"status": "one", "type": "status"})
+    engine.publish({"status": "two", "type": "status"})
+    first, second = list(events.queue)
+    assert (first["status"], second["status"]) == ("one", "two")
+    assert second["seq"] > first["seq"]
+    assert "time" in first
+
+    engine.unsubscribe(events)
+    engine.publish({"status": "three", "type": "status"})
+    assert events.empty()
+
+
+def test_slow_subscriber_loses_oldest_events():
+    engine = make_engine()
+    events = engine.subscribe(max_events=2)
+    for status in ("one", "two", "three"):
+        engine.publish({"status": status, "type": "status"})
+    assert [event["status"] for event in list(events.queue)] == ["two", "three"]
+
+
+def test_constructing_engine_does_not_start_a_session(fake_stream):
+    engine = make_engine()
+    assert not engine.is_recording()
+    assert fake_stream.streams == []
+
+
+def test_session_publishes_state_events_and_flushes_on_stop(fake_stream):
+    engine = make_engine(FakeModel(lambda audio_data: "we climb the hill"))
+    events = engine.subscribe()
+    assert engine.start()
+    assert not engine.start()
+    # Half a chunk: only the flush on stop gets it transcribed
+    open_stream().feed()
+    engine.stop()
+
+    assert event_types(events) == ["state", "transcription", "image", "keywords", "state"]
+    recording, transcription, image, keywords, stopped = list(events.queue)
+    assert recording["state"] == "recording"
+    # The pending text had no sentence end; finish() commits it
+    assert transcription["text"] == "we climb the hill"
+    assert image["image"] == "HILL CLIMBING.png"
+    assert keywords["keywords"] == ["we", "climb", "the", "hill"]
+    assert stopped["state"] == "stopped"
+
+
+def test_pause_and_resume_publish_state_events(fake_stream):
+    engine = make_engine()
+    events = engine.subscribe()
+    engine.start()
+    open_stream()
+    engine.pause()
+    engine.resume()
+    engine.stop()
+    assert [event["state"] for event in list(events.queue)] == ["recording", "paused", "recording", "stopped"]
+
+
+def test_channels_are_gated_decoded_in_parallel_and_tagged(fake_stream):
+    threads = []
+
+    # Each channel says its own level; channel 0 is the slowest to decode
+    def text(audio_data):
+        threads.append(threading.current_thread().name)
+        level = int(round(float(audio_data[0]) * 32768))
+        if level == 1000:
+            time.sleep(0.1)
+        return f"level {level}."
+
+    model = FakeModel(text)
+    engine = make_engine(model, channels=3)
+    events = engine.subscribe()
+    engine.start()
+    stream = open_stream()
+    # Channel 1 is silent
+    stream.feed([1000, 0, 3000])
+    stream.feed([1000, 0, 3000])
+    wait_for(lambda: event_types(events).count("transcription") == 2)
+    engine.stop()
+
+    transcriptions = [event for event in list(events.queue) if event["type"] == "transcription"]
+    assert [(event["channel"], event["text"]) for event in transcriptions] == [(0, "level 1000."), (2, "level 3000.")]
+    assert transcriptions[0]["captured_at"] == transcriptions[1]["captured_at"]
+    # Only the active channels were decoded, on the executor, with Whisper's VAD on
+    assert len(model.calls) == 2
+    assert all(call["vad_filter"] for call in model.calls)
+    assert all(name.startswith("decoder") for name in threads)
+
+
+def test_language_is_detected_once_and_routes_keyword_matching(fake_stream):
+    model = FakeModel(lambda audio_data: "la colina.", language="es")
+    engine = make_engine(model, multilingual=True, language_maps={"es": {"colina": "HILL CLIMBING.png"}})
+    events = engine.subscribe()
+    engine.start()
+    stream = open_stream()
+    for _ in range(4):
+        stream.feed()
+    wait_for(lambda: event_types(events).count("keywords") == 2)
+    engine.stop()
+
+    # Whisper detects the language on the first chunk only
+    assert [call["language"] for call in model.calls] == [None, "es"]
+    language_events = [event for event in list(events.queue) if event["type"] == "language"]
+    assert [event["language"] for event in language_events] == ["es"]
+    # "colina" is only in the Spanish keyword map
+    images = [event["image"] for event in list(events.queue) if event["type"] == "image"]
+    assert images == ["HILL CLIMBING.png", "HILL CLIMBING.png"]
+
+
+def test_unix_socket_client_receives_ndjson_events(tmp_path):
+    engine = make_engine()
+    socket_path = str(tmp_path / "events.sock")
+    servers = serve_events(engine, unix_socket=socket_path)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        client.settimeout(2)
+        # The handler subscribes once the connection is accepted
+        wait_for(lambda: engine._subscribers)
+        engine.publish({"text": "hill climbing", "type": "transcription"})
+        engine.publish({"state": "stopped", "type": "state"})
+        reader = client.makefile("r", encoding="utf-8")
+        lines = [json.loads(reader.readline()) for _ in range(2)]
+    finally:
+        client.close()
+        close_servers(servers)
+
+    assert [event["type"] for event in lines] == ["transcription", "state"]
+    assert lines[0]["text"] == "hill climbing"
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.parametrize("substring_match, images", [(False, []), (True, ["HILL CLIMBING.png"])])
+def test_substring_matching_is_optional(substring_match, images):
+    engine = make_engine(substring_match=substring_match)
+    assert engine.match_images(["hills"]) == images
+    assert engine.match_images(["tree"]) == ["TREE.png"]
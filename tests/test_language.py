@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from language import DRIFT_CHUNKS, LanguageSession, SpacyPipelines, language_keyword_maps
+
+
+def segments(*logprobs):
+    return [SimpleNamespace(text="words", avg_logprob=logprob) for logprob in logprobs]
+
+
+def info(language, probability=0.9, all_language_probs=None):
+    return SimpleNamespace(language=language, language_probability=probability,
+                           all_language_probs=all_language_probs)
+
+
+def test_language_is_detected_once_and_cached():
+    session = LanguageSession()
+    assert session.transcribe_language() is None
+    assert session.observe(segments(-0.3), info("es", 0.8))
+    assert (session.language, session.probability) == ("es", 0.8)
+    # Later chunks reuse the cached language
+    assert session.transcribe_language() == "es"
+    assert not session.observe(segments(-0.3), info("en"))
+    assert session.language == "es"
+
+
+def test_silent_chunk_does_not_settle_the_language():
+    session = LanguageSession()
+    assert not session.observe([], info("nn", 0.1))
+    assert session.transcribe_language() is None
+    assert session.observe(segments(-0.2), info("en"))
+    assert session.language == "en"
+
+
+def test_detection_is_restricted_to_configured_languages():
+    session = LanguageSession(languages=["en", "es"])
+    session.observe(segments(-0.3), info("pt", 0.6, [("pt", 0.6), ("es", 0.3), ("en", 0.1)]))
+    assert (session.language, session.probability) == ("es", 0.3)
+
+    session = LanguageSession(languages=["en", "es"])
+    session.observe(segments(-0.3), info("pt", 0.6, [("pt", 0.6)]))
+    assert (session.language, session.probability) == ("en", 0.0)
+
+
+def test_low_confidence_chunks_trigger_redetection():
+    session = LanguageSession()
+    session.observe(segments(-0.3), info("en"))
+    for _ in range(DRIFT_CHUNKS - 1):
+        session.observe(segments(-1.5, -1.2), info("en"))
+        assert session.transcribe_language() == "en"
+    session.observe(segments(-1.5), info("en"))
+    assert session.transcribe_language() is None
+
+    # The next chunk with speech detects the language again
+    assert session.observe(segments(-0.4), info("es"))
+    assert session.transcribe_language() == "es"
+
+
+def test_confident_chunk_resets_drift_count():
+    session = LanguageSession()
+    session.observe(segments(-0.3), info("en"))
+    for _ in range(DRIFT_CHUNKS - 1):
+        session.observe(segments(-1.5), info("en"))
+    session.observe(segments(-0.3), info("en"))
+    # Silent chunks neither count as drift nor reset it
+    session.observe([], info("en"))
+    for _ in range(DRIFT_CHUNKS - 1):
+        session.observe(segments(-1.5), info("en"))
+    assert session.transcribe_language() == "en"
+
+
+def test_language_keyword_maps_ignores_malformed_entries():
+    data = {"keywords": {"hill": "HILL CLIMBING.png"},
+            "languages": {"es": {"colina": "HILL CLIMBING.png"}, "fr": "colline"}}
+    assert language_keyword_maps(data) == {"es": {"colina": "HILL CLIMBING.png"}}
+    assert language_keyword_maps({"hill": "HILL CLIMBING.png"}) == {}
+
+
+def test_unknown_language_falls_back_to_default_pipeline():
+    default = object()
+    pipelines = SpacyPipelines(default)
+    assert pipelines.get(None) is default
+    assert pipelines.get("xx") is default
@@ -0,0 +1,172 @@
+import threading
+import time
+import pytest
+from lecture_plan import ImagePrefetcher, LecturePlan, split_keyword_map
+
+KEYWORD_IMAGE_MAP = {
+    "peas": "PEAS.png",
+    "breadth": "BFS.png",
+    "depth": "DFS.png",
+    "hill": "HILL CLIMBING.png",
+    "Hill": "HILL CLIMBING.png",
+    "star": "A STAR.png",
+    "turing": "ALAN TURING.jpg",
+}
+PLAN = ["peas", "breadth", "depth", "hill", "star"]
+
+
+def make_plan(position=-1):
+    plan = LecturePlan(PLAN, KEYWORD_IMAGE_MAP)
+    # Walk the lecture through the plan one topic at a time
+    for image in plan.images[:position + 1]:
+        plan.advance(image)
+    assert plan.position == position
+    return plan
+
+
+def test_split_keyword_map_accepts_both_formats():
+    assert split_keyword_map({"hill": "HILL CLIMBING.png"}) == ({"hill": "HILL CLIMBING.png"}, [])
+    data = {"keywords": KEYWORD_IMAGE_MAP, "plan": PLAN}
+    assert split_keyword_map(data) == (KEYWORD_IMAGE_MAP, PLAN)
+
+
+def test_plan_resolves_keywords_to_images():
+    plan = make_plan()
+    assert plan.images == ["PEAS.png", "BFS.png", "DFS.png", "HILL CLIMBING.png", "A STAR.png"]
+    assert plan.upcoming() == ["PEAS.png", "BFS.png"]
+    assert not LecturePlan([], KEYWORD_IMAGE_MAP)
+
+
+def test_pick_prefers_current_and_upcoming_images():
+    plan = make_plan(1)
+    assert plan.pick(["PEAS.png", "HILL CLIMBING.png", "DFS.png"]) == "DFS.png"
+    assert plan.pick(["PEAS.png", "BFS.png"]) == "BFS.png"
+    # Earlier images beat unplanned ones
+    assert plan.pick(["ALAN TURING.jpg", "PEAS.png"]) == "PEAS.png"
+    assert plan.pick([]) is None
+
+
+def test_advance_moves_to_next_topic_and_ignores_unplanned_images():
+    plan = make_plan(1)
+    plan.advance("DFS.png")
+    assert plan.position == 2
+    plan.advance("ALAN TURING.jpg")
+    assert plan.position == 2
+    assert plan.upcoming() == ["HILL CLIMBING.png", "A STAR.png"]
+
+
+def test_single_mention_of_later_topic_does_not_jump_ahead():
+    plan = make_plan(0)
+    plan.advance("A STAR.png")
+    assert plan.position == 0
+    assert plan.upcoming() == ["BFS.png", "DFS.png"]
+    assert plan.pick(["BFS.png", "A STAR.png"]) == "BFS.png"
+
+
+def test_repeated_mentions_of_later_topic_jump_ahead():
+    plan = make_plan(0)
+    plan.advance("A STAR.png")
+    plan.advance("A STAR.png")
+    assert plan.position == 4
+
+
+def test_single_mention_of_earlier_topic_does_not_move_back():
+    plan = make_plan(3)
+    plan.advance("BFS.png")
+    assert plan.position == 3
+    assert plan.upcoming() == ["A STAR.png"]
+
+
+def test_repeated_mentions_of_earlier_topic_move_back():
+    plan = make_plan(3)
+    plan.advance("BFS.png")
+    plan.advance("BFS.png")
+    assert plan.position == 1
+
+
+def test_current_topic_resets_jump_count():
+    plan = make_plan(3)
+    plan.advance("BFS.png")
+    plan.advance("HILL CLIMBING.png")
+    plan.advance("BFS.png")
+    assert plan.position == 3
+
+
+# Render function whose calls can be held back and counted
+class Renderer:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.failures = set()
+
+    def __call__(self, image_path):
+        self.calls.append(image_path)
+        self.release.wait(2)
+        if image_path in self.failures:
+            self.failures.discard(image_path)
+            raise OSError(f"cannot decode {image_path}")
+        return image_path.upper()
+
+
+def test_prefetched_image_is_rendered_once():
+    render = Renderer()
+    prefetcher = ImagePrefetcher(render)
+    prefetcher.prefetch(["a.png", "b.png"])
+    assert prefetcher.get("b.png") == "B.PNG"
+    assert prefetcher.get("b.png") == "B.PNG"
+    assert render.calls.count("b.png") == 1
+    prefetcher.close()
+
+
+def test_unpredicted_image_is_rendered_on_the_callers_thread_and_cached():
+    render = Renderer()
+    prefetcher = ImagePrefetcher(render)
+    assert prefetcher.get("c.png") == "C.PNG"
+    assert prefetcher.get("c.png") == "C.PNG"
+    assert render.calls == ["c.png"]
+    prefetcher.close()
+
+
+def test_cache_evicts_least_recently_used():
+    render = Renderer()
+    prefetcher = ImagePrefetcher(render, max_images=2)
+    prefetcher.get("a.png")
+    prefetcher.get("b.png")
+    prefetcher.get("a.png")
+    prefetcher.get("c.png")
+    # b.png was least recently used and has to be rendered again
+    prefetcher.get("b.png")
+    assert render.calls == ["a.png", "b.png", "c.png", "b.png"]
+    prefetcher.close()
+
+
+def test_evicted_pending_render_falls_back_to_synchronous_render():
+    render = Renderer()
+    render.release.clear()
+    prefetcher = ImagePrefetcher(render, max_images=1)
+    # a.png occupies the worker and b.png waits behind it
+    prefetcher.prefetch(["a.png"])
+    prefetcher.prefetch(["b.png"])
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(prefetcher.get("b.png")))
+    waiter.start()
+    time.sleep(0.1)
+    # c.png evicts and cancels the queued b.png render while get() waits on it
+    prefetcher.prefetch(["c.png"])
+    render.release.set()
+    waiter.join(2)
+    assert results == ["B.PNG"]
+    prefetcher.close()
+
+
+def test_failed_render_is_dropped_and_retried():
+    render = Renderer()
+    render.failures.add("bad.png")
+    prefetcher = ImagePrefetcher(render)
+    prefetcher.prefetch(["bad.png"])
+    with pytest.raises(OSError):
+        prefetcher.get("bad.png")
+    assert prefetcher.get("bad.png") == "BAD.PNG"
+    assert render.calls == ["bad.png", "bad.png"]
+    prefetcher.close()
@@ -0,0 +1,158 @@
+import queue
+import threading
+import numpy as np
+import pytest
+from fakes import FakeStream, open_stream, wait_for
+from recorder import RecordingController, chunk_to_float32, put_latest
+
+SAMPLERATE = 100
+DURATION = 1
+
+
+def make_controller(chunks, on_stop=None, **kwargs):
+    def process_chunk(audio_data, publish, captured_at):
+        chunks.append(audio_data)
+        publish({"samples": len(audio_data), "type": "chunk"})
+    return RecordingController(process_chunk, on_stop, samplerate=SAMPLERATE, duration=DURATION, **kwargs)
+
+
+def test_start_stop_lifecycle_releases_stream_and_thread(fake_stream):
+    controller = make_controller([])
+    assert controller.start()
+    assert not controller.start()
+    stream = open_stream()
+    assert controller.is_recording()
+
+    assert controller.stop()
+    assert not controller.is_recording()
+    assert stream.closed
+    assert not any(thread.name == "recording-controller" for thread in threading.enumerate())
+
+    # A new session opens a fresh stream
+    assert controller.start()
+    open_stream()
+    assert len(FakeStream.streams) == 2
+    controller.stop()
+
+
+def test_processor_can_be_given_at_start(fake_stream):
+    controller = RecordingController(samplerate=SAMPLERATE, duration=DURATION)
+    with pytest.raises(ValueError):
+        controller.start()
+    assert not controller.is_recording()
+
+    chunks = []
+    controller.start(lambda audio_data, publish, captured_at: chunks.append(audio_data))
+    open_stream().feed()
+    controller.stop()
+    assert [len(chunk) for chunk in chunks] == [SAMPLERATE // 2]
+
+
+def test_blocks_are_assembled_into_chunks(fake_stream):
+    chunks = []
+    controller = make_controller(chunks)
+    controller.start()
+    stream = open_stream()
+    assert stream.blocksize == SAMPLERATE // 2
+
+    stream.feed()
+    stream.feed()
+    wait_for(lambda: chunks)
+    controller.stop()
+    assert len(chunks) == 1
+    assert len(chunks[0]) == SAMPLERATE * DURATION
+
+
+def test_stop_flushes_partial_chunk_and_calls_on_stop(fake_stream):
+    chunks = []
+    stopped = []
+    controller = make_controller(chunks, on_stop=lambda publish: stopped.append(True))
+    controller.start()
+    open_stream().feed()
+    controller.stop()
+    assert [len(chunk) for chunk in chunks] == [SAMPLERATE // 2]
+    assert stopped == [True]
+
+
+def test_stop_without_flush_drops_pending_audio(fake_stream):
+    chunks = []
+    controller = make_controller(chunks)
+    controller.start()
+    open_stream().feed()
+    controller.stop(flush=False)
+    assert chunks == []
+
+
+def test_pause_drops_audio_until_resumed(fake_stream):
+    chunks = []
+    controller = make_controller(chunks)
+    controller.start()
+    stream = open_stream()
+
+    controller.pause()
+    assert controller.is_paused()
+    stream.feed()
+    stream.feed()
+    controller.resume()
+    assert not controller.is_paused()
+    stream.feed()
+    controller.stop()
+    assert [len(chunk) for chunk in chunks] == [SAMPLERATE // 2]
+
+
+def test_failing_chunk_is_reported_and_session_continues(fake_stream):
+    calls = []
+    stopped = []
+
+    def process_chunk(audio_data, publish, captured_at):
+        calls.append(audio_data)
+        if len(calls) == 1:
+            raise RuntimeError("transcription failed")
+
+    controller = RecordingController(process_chunk, lambda publish: stopped.append(True),
+                                     samplerate=SAMPLERATE, duration=DURATION)
+    controller.start()
+    stream = open_stream()
+    for _ in range(4):
+        stream.feed()
+    wait_for(lambda: len(calls) == 2)
+    assert controller.is_recording()
+    controller.stop()
+
+    events = list(controller.events.queue)
+    assert {"error": "transcription failed", "type": "error"} in events
+    assert controller.error is None
+    assert stopped == [True]
+
+
+def test_audio_queue_is_bounded(fake_stream):
+    controller = make_controller([], max_audio_chunks=2)
+    # Two chunks of two half-second blocks each
+    assert controller.audio_queue.maxsize == 4
+
+
+def test_put_latest_drops_oldest_item():
+    q = queue.Queue(maxsize=2)
+    for item in range(5):
+        put_latest(q, item)
+    assert list(q.queue) == [3, 4]
+
+
+def test_chunk_to_float32_mono():
+    audio = chunk_to_float32(np.array([0, 16384, -32768], dtype=np.int16).tobytes())
+    assert audio.dtype == np.float32
+    assert audio.tolist() == [0.0, 0.5, -1.0]
+
+
+def test_chunk_to_float32_splits_interleaved_channels():
+    interleaved = np.array([0, 16384, -16384, 1, 2, 3, 4, 5, 6, 7, 8, 9], dtype=np.int16)
+    audio = chunk_to_float32(interleaved.tobytes(), channels=3)
+    assert audio.shape == (3, 4)
+    assert audio.dtype == np.float32
+    assert audio.flags["C_CONTIGUOUS"]
+    assert (audio * 32768).astype(np.int16).tolist() == [[0, 1, 4, 7], [16384, 2, 5, 8], [-16384, 3, 6, 9]]
+
+
+def test_chunk_to_float32_single_frame_per_channel():
+    audio = chunk_to_float32(np.array([-32768, 16384], dtype=np.int16).tobytes(), channels=2)
+    assert audio.tolist() == [[-1.0], [0.5]]
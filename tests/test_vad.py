@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from vad import MIN_LEVEL, NOISE_RISE, SPEECH_RATIO, ChannelVAD
+
+SAMPLERATE = 16000
+
+
+def noise(level, seconds=1.0, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(SAMPLERATE * seconds)).astype(np.float32)
+
+
+def tone(level, seconds=1.0):
+    t = np.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+    return (level * np.sqrt(2) * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+# Words with short pauses between them over a quiet room
+def speech(level, seconds=1.0, seed=0):
+    audio = tone(level, seconds)
+    word = int(SAMPLERATE * 0.25)
+    pause = int(SAMPLERATE * 0.08)
+    for start in range(word, len(audio), word + pause):
+        audio[start:start + pause] = 0
+    return audio + noise(0.001, seconds, seed)
+
+
+def test_silence_and_speech_are_told_apart_per_channel():
+    vad = ChannelVAD(2, SAMPLERATE)
+    active = vad.update(np.stack([noise(0.001), speech(0.2)]))
+    assert active.tolist() == [False, True]
+
+
+def test_continuous_speech_stays_active():
+    vad = ChannelVAD(1, SAMPLERATE)
+    for seed in range(50):
+        assert vad.update(speech(0.2, seed=seed)[None]).tolist() == [True]
+    assert vad.noise_floor[0] < MIN_LEVEL / SPEECH_RATIO
+
+
+@pytest.mark.parametrize("level", [0.01, 0.02])
+def test_steady_noise_goes_inactive_after_a_few_chunks(level):
+    vad = ChannelVAD(2, SAMPLERATE)
+    history = [vad.update(np.stack([noise(level, seed=seed), speech(0.2, seed=seed)])).tolist()
+               for seed in range(20)]
+    # Loud enough to pass at first, then learned as background
+    assert history[0] == [True, True]
+    assert all(active == [False, True] for active in history[5:])
+
+
+def test_noise_floor_drops_fast_and_rises_slowly():
+    vad = ChannelVAD(1, SAMPLERATE, min_level=0.0001)
+    start = vad.noise_floor[0]
+    vad.update(noise(0.00001)[None])
+    assert vad.noise_floor[0] < start / 2 + 0.00001
+
+    vad = ChannelVAD(1, SAMPLERATE)
+    start = vad.noise_floor[0]
+    vad.update(noise(0.1)[None])
+    assert start < vad.noise_floor[0] < start + NOISE_RISE * 0.1
+
+
+def test_speech_after_quiet_room_is_detected():
+    vad = ChannelVAD(1, SAMPLERATE)
+    for seed in range(5):
+        assert vad.update(noise(0.001, seed=seed)[None]).tolist() == [False]
+    assert vad.update(speech(0.05)[None]).tolist() == [True]
+
+
+def test_short_chunk_is_inactive():
+    vad = ChannelVAD(3, SAMPLERATE)
+    assert vad.update(np.zeros((3, 10), dtype=np.float32)).tolist() == [False, False, False]
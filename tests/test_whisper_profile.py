@@ -0,0 +1,21 @@
+from whisper_profile import DEFAULT_PROFILE, load_whisper_profile, save_whisper_profile
+
+
+def test_missing_profile_uses_defaults(tmp_path):
+    assert load_whisper_profile(str(tmp_path / "missing.json")) == DEFAULT_PROFILE
+
+
+def test_saved_profile_overrides_defaults_and_ignores_results(tmp_path):
+    profile_file = str(tmp_path / "profile.json")
+    save_whisper_profile({"model_size": "base", "num_workers": 2, "wer": 0.1}, profile_file)
+    assert load_whisper_profile(profile_file) == dict(DEFAULT_PROFILE, model_size="base", num_workers=2)
+
+
+def test_invalid_profile_warns_on_stderr_only(tmp_path, capsys):
+    profile_file = tmp_path / "profile.json"
+    profile_file.write_text("{not json")
+    assert load_whisper_profile(str(profile_file)) == DEFAULT_PROFILE
+    captured = capsys.readouterr()
+    # stdout carries the engine's NDJSON event stream
+    assert captured.out == ""
+    assert "not a valid JSON" in captured.err
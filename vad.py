@@ -0,0 +1,54 @@
+import numpy as np
+
+# Length of the frames the energy is measured over
+FRAME_SECONDS = 0.03
+# A frame is speech when its RMS is this many times the channel's noise floor...
+SPEECH_RATIO = 3.0
+# ...and above this absolute level (float32 samples in [-1, 1))
+MIN_LEVEL = 0.005
+# Fraction of speech frames a chunk needs before the channel is decoded
+MIN_SPEECH_FRACTION = 0.1
+# Percentile of a chunk's frame levels taken as that chunk's background noise;
+# speech has enough gaps between words to keep it low
+NOISE_PERCENTILE = 10
+# How quickly each channel's noise floor follows that estimate: it drops quickly
+# when the room gets quieter and rises slowly when it gets louder
+NOISE_FALL = 0.5
+NOISE_RISE = 0.1
+
+
+# Energy-based voice activity detection with an adaptive noise floor per channel.
+# update() takes a (channels, samples) chunk and returns a boolean array telling
+# which channels contain speech; all channels are processed in one vectorized pass.
+# The floor starts where the threshold equals min_level and follows the quietest
+# frames of each chunk, so steady noise such as a fan is learned within a few
+# chunks while the pauses in speech keep a talker's floor down.
+class ChannelVAD:
+    def __init__(self, channels, samplerate=16000, speech_ratio=SPEECH_RATIO, min_level=MIN_LEVEL,
+                 min_speech_fraction=MIN_SPEECH_FRACTION, noise_fall=NOISE_FALL, noise_rise=NOISE_RISE):
+        self.channels = channels
+        self.frame_length = max(1, int(samplerate * FRAME_SECONDS))
+        self.speech_ratio = speech_ratio
+        self.min_level = min_level
+        self.min_speech_fraction = min_speech_fraction
+        self.noise_fall = noise_fall
+        self.noise_rise = noise_rise
+        self.noise_floor = np.full(channels, min_level / speech_ratio, dtype=np.float32)
+
+    def update(self, audio):
+        n_frames = audio.shape[1] // self.frame_length
+        if n_frames == 0:
+            return np.zeros(self.channels, dtype=bool)
+        frames = audio[:, :n_frames * self.frame_length].reshape(self.channels, n_frames, self.frame_length)
+        rms = np.sqrt(np.mean(np.square(frames), axis=2))
+
+        threshold = np.maximum(self.noise_floor * self.speech_ratio, self.min_level)
+        speech = rms > threshold[:, None]
+        active = speech.mean(axis=1) >= self.min_speech_fraction
+
+        # Track the noise floor from the quietest frames of each channel, including
+        # noise above the current threshold
+        quiet = np.percentile(rms, NOISE_PERCENTILE, axis=1)
+        rate = np.where(quiet < self.noise_floor, self.noise_fall, self.noise_rise)
+        self.noise_floor += (rate * (quiet - self.noise_floor)).astype(np.float32)
+        return active
@@ -99,5 +99,6 @@ and also it does not tell you the answer.
 """
 
 # Calculate WER
-error_rate = wer(reference, hypothesis)
-print(f"Word Error Rate (WER): {error_rate * 100:.2f}%")
+if __name__ == "__main__":
+    error_rate = wer(reference, hypothesis)
+    print(f"Word Error Rate (WER): {error_rate * 100:.2f}%")
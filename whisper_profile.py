@@ -0,0 +1,42 @@
+import json
+import sys
+from faster_whisper import WhisperModel
+
+# Profile written by autotune.py and loaded by every app at startup
+PROFILE_FILE = "whisper_profile.json"
+
+# Settings used when no profile has been saved yet
+DEFAULT_PROFILE = {
+    "model_size": "small",
+    "device": "cpu",
+    "compute_type": "int8",
+    "cpu_threads": 0,
+    "num_workers": 1,
+}
+
+
+# Function to load the saved WhisperModel settings, falling back to the defaults
+def load_whisper_profile(profile_file=PROFILE_FILE):
+    profile = dict(DEFAULT_PROFILE)
+    try:
+        with open(profile_file, 'r') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return profile
+    except json.JSONDecodeError:
+        print(f"The file {profile_file} is not a valid JSON, using default Whisper settings.", file=sys.stderr)
+        return profile
+    profile.update({key: saved[key] for key in DEFAULT_PROFILE if key in saved})
+    return profile
+
+
+# Function to save WhisperModel settings along with any benchmark results
+def save_whisper_profile(profile, profile_file=PROFILE_FILE):
+    with open(profile_file, 'w') as f:
+        json.dump(profile, f, indent=4)
+
+
+# Function to create a WhisperModel from a profile
+def create_whisper_model(profile):
+    return WhisperModel(profile["model_size"], device=profile["device"], compute_type=profile["compute_type"],
+                        cpu_threads=profile["cpu_threads"], num_workers=profile["num_workers"])